@@ -1,8 +1,11 @@
+import asyncio
 import os
 from typing import Optional
 
 import httpx
+import orjson
 import uvicorn
+from cachetools import TTLCache
 from fastmcp import FastMCP
 from starlette.middleware import Middleware
 from starlette.middleware.cors import CORSMiddleware
@@ -11,70 +14,106 @@ EMPLOYEE_API_URL = os.environ.get("EMPLOYEE_API_URL", "http://localhost:8001")
 
 mcp = FastMCP("Employee Directory")
 
+# One long-lived client so every tool call reuses the same keep-alive pool
+# instead of paying a fresh TCP handshake per request. Async so the event
+# loop can overlap concurrent tool calls (OpenAI emits parallel tool calls).
+_client = httpx.AsyncClient(
+    base_url=EMPLOYEE_API_URL,
+    timeout=30.0,
+    # HTTP/2 multiplexes concurrent tool calls over one TCP+TLS session
+    # when the upstream supports it; httpx falls back to HTTP/1.1 otherwise.
+    http2=True,
+    # Generous keep-alive so idle connections survive the gap between LLM
+    # turns instead of being closed and re-handshaken.
+    limits=httpx.Limits(max_keepalive_connections=100, max_connections=100, keepalive_expiry=60.0),
+)
+
+
+# Short-lived result cache for GET endpoints: departments, schema, etc.
+# change rarely, yet every LLM turn re-fetches them over HTTP.
+_cache: TTLCache = TTLCache(maxsize=512, ttl=30)
+
+
+async def _api(method: str, path: str, **kwargs):
+    key = None
+    if method == "GET":
+        key = (path, tuple(sorted((kwargs.get("params") or {}).items())))
+        if key in _cache:
+            return _cache[key]
+
+    resp = await _client.request(method, path, **kwargs)
+
+    # Parse the body exactly once — the error branch previously called
+    # resp.json() again on top of the success-path parse. orjson works on
+    # the raw bytes directly, skipping the decode step stdlib json needs.
+    try:
+        data = orjson.loads(resp.content)
+    except ValueError:
+        data = None
 
-def _api(method: str, path: str, **kwargs):
-    url = f"{EMPLOYEE_API_URL}{path}"
-    resp = httpx.request(method, url, **kwargs)
     if resp.status_code in (400, 404):
-        raise ValueError(resp.json().get("detail", resp.text))
+        raise ValueError(data.get("detail", resp.text) if isinstance(data, dict) else resp.text)
     resp.raise_for_status()
-    return resp.json()
+
+    if key is not None:
+        _cache[key] = data
+    return data
 
 
 # ── Tools ──────────────────────────────────────────────────────────────────
 
 @mcp.tool()
-def list_employees(active_only: bool = True) -> list[dict]:
+async def list_employees(active_only: bool = True) -> list[dict]:
     """Return all employees, optionally filtered to active ones only."""
-    return _api("GET", "/employees", params={"active_only": active_only})
+    return await _api("GET", "/employees", params={"active_only": active_only})
 
 
 @mcp.tool()
-def get_employee(employee_id: int) -> dict:
+async def get_employee(employee_id: int) -> dict:
     """Return a single employee record by ID."""
-    return _api("GET", f"/employees/{employee_id}")
+    return await _api("GET", f"/employees/{employee_id}")
 
 
 @mcp.tool()
-def search_employees(query: str) -> list[dict]:
+async def search_employees(query: str) -> list[dict]:
     """Search employees by first name, last name, email, or job title (case-insensitive)."""
-    return _api("GET", "/employees/search", params={"q": query})
+    return await _api("GET", "/employees/search", params={"q": query})
 
 
 @mcp.tool()
-def list_departments() -> list[dict]:
+async def list_departments() -> list[dict]:
     """Return all departments with employee headcount."""
-    return _api("GET", "/departments")
+    return await _api("GET", "/departments")
 
 
 @mcp.tool()
-def get_employees_by_department(department_name: str, active_only: bool = True) -> list[dict]:
+async def get_employees_by_department(department_name: str, active_only: bool = True) -> list[dict]:
     """Return all employees in a given department (case-insensitive name match)."""
-    return _api("GET", f"/departments/{department_name}/employees", params={"active_only": active_only})
+    return await _api("GET", f"/departments/{department_name}/employees", params={"active_only": active_only})
 
 
 @mcp.tool()
-def get_salary_stats(department_name: Optional[str] = None) -> dict:
+async def get_salary_stats(department_name: Optional[str] = None) -> dict:
     """Return min / max / average salary, optionally scoped to a department."""
     params = {}
     if department_name:
         params["department"] = department_name
-    return _api("GET", "/salary-stats", params=params)
+    return await _api("GET", "/salary-stats", params=params)
 
 
 @mcp.tool()
-def get_schema() -> dict:
+async def get_schema() -> dict:
     """Return the database schema: every table with its column names and types.
 
     Returns:
         A dict keyed by table name, each value being a list of
         { name, type, notnull, pk } dicts.
     """
-    return _api("GET", "/schema")
+    return await _api("GET", "/schema")
 
 
 @mcp.tool()
-def execute_query(sql: str, params: list | None = None) -> dict:
+async def execute_query(sql: str, params: list | None = None) -> dict:
     """Execute a custom read-only SELECT query against the employee database.
 
     Only SELECT statements are permitted. Any attempt to run INSERT, UPDATE,
@@ -95,15 +134,78 @@ def execute_query(sql: str, params: list | None = None) -> dict:
                   job_title, salary, hire_date, is_active)
       departments (id, name)
     """
-    return _api("POST", "/query", json={"sql": sql, "params": params})
+    return await _api("POST", "/query", json={"sql": sql, "params": params})
+
+
+# Registry of the plain coroutine functions behind each tool, so
+# batch_execute can dispatch without going through the MCP layer again.
+# (getattr(.fn) unwraps fastmcp's FunctionTool when the decorator returns one.)
+_TOOLS = {
+    name: getattr(obj, "fn", obj)
+    for name, obj in (
+        ("list_employees", list_employees),
+        ("get_employee", get_employee),
+        ("search_employees", search_employees),
+        ("list_departments", list_departments),
+        ("get_employees_by_department", get_employees_by_department),
+        ("get_salary_stats", get_salary_stats),
+        ("get_schema", get_schema),
+        ("execute_query", execute_query),
+    )
+}
+
+_BATCH_SEMAPHORE = asyncio.Semaphore(8)
+
+
+@mcp.tool()
+async def batch_execute(calls: list[dict], stop_on_error: bool = False) -> list[dict]:
+    """Run several tool calls in one round trip and return all results.
+
+    Each entry in `calls` is {"tool": <tool name>, "args": {...}}. Results
+    come back in the same order as the requests. Use this instead of issuing
+    tools one at a time when you already know every call you need — it saves
+    a full LLM turn per collapsed call.
+
+    Args:
+        calls:         List of {"tool": name, "args": {...}} entries.
+        stop_on_error: When true, sub-calls after the first failure are
+                       skipped and reported as skipped.
+
+    Returns:
+        A list of {"tool": name, "ok": bool, "result": ... | "error": ...}.
+    """
+    async def _run_one(call: dict) -> dict:
+        name = call.get("tool", "")
+        fn = _TOOLS.get(name)
+        if fn is None:
+            return {"tool": name, "ok": False, "error": f"Unknown tool: {name!r}"}
+        try:
+            async with _BATCH_SEMAPHORE:
+                result = await fn(**(call.get("args") or {}))
+            return {"tool": name, "ok": True, "result": result}
+        except Exception as exc:
+            return {"tool": name, "ok": False, "error": str(exc)}
+
+    if stop_on_error:
+        results = []
+        failed = False
+        for call in calls:
+            if failed:
+                results.append({"tool": call.get("tool", ""), "ok": False, "error": "skipped"})
+                continue
+            outcome = await _run_one(call)
+            results.append(outcome)
+            failed = not outcome["ok"]
+        return results
+
+    return list(await asyncio.gather(*(_run_one(call) for call in calls)))
 
 
 # ── Resources ──────────────────────────────────────────────────────────────
 
-@mcp.resource("policy://leave")
-def get_leave_policy() -> str:
-    """Company leave policy document."""
-    return """# Employee Leave Policy
+# Static document: build the string once at import so every resource read
+# serves the same interned object instead of re-creating the literal.
+_LEAVE_POLICY_MD = """# Employee Leave Policy
 
 ## 1. Annual Leave
 - Full-time employees accrue 15 days of paid annual leave per calendar year (pro-rated for part-time).
@@ -142,6 +244,12 @@ For questions regarding this policy, contact **hr@company.com** or visit the HR
 """
 
 
+@mcp.resource("policy://leave")
+def get_leave_policy() -> str:
+    """Company leave policy document."""
+    return _LEAVE_POLICY_MD
+
+
 # ── Entry point ────────────────────────────────────────────────────────────
 if __name__ == "__main__":
     cors = Middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
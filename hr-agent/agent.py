@@ -22,6 +22,7 @@ import asyncio
 import os
 import sys
 
+import httpx
 from dotenv import load_dotenv
 from langchain_core.messages import HumanMessage
 from langchain_openai import ChatOpenAI
@@ -33,6 +34,8 @@ load_dotenv()
 # ── Config ─────────────────────────────────────────────────────────────────
 MCP_URL = os.getenv("EMPLOYEE_MCP_URL", "http://localhost:8000/mcp")
 
+_EXIT_WORDS = frozenset({"exit", "quit", "bye"})
+
 SYSTEM_PROMPT = """You are an expert HR assistant with access to a live Employee Directory.
 
 You have the following tools available (call them whenever data is needed):
@@ -55,12 +58,29 @@ Guidelines:
 """
 
 
+# Keep-alive generous enough that idle connections survive the gap between
+# LLM turns; the httpx default 5s expiry closes them mid-conversation.
+_POOL_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=100, keepalive_expiry=60.0)
+
+
+def _httpx_client_factory(headers=None, timeout=None, auth=None) -> httpx.AsyncClient:
+    """Keep-alive client for the streamable-HTTP transport so repeated
+    MCP calls reuse the same TCP connection."""
+    return httpx.AsyncClient(
+        headers=headers,
+        timeout=timeout if timeout is not None else 30.0,
+        auth=auth,
+        limits=_POOL_LIMITS,
+    )
+
+
 def _make_client() -> MultiServerMCPClient:
     return MultiServerMCPClient(
         {
             "employee_directory": {
                 "url": MCP_URL,
                 "transport": "streamable_http",
+                "httpx_client_factory": _httpx_client_factory,
             }
         }
     )
@@ -74,14 +94,51 @@ def _make_llm() -> ChatOpenAI:
         api_key=api_key,
         model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
         temperature=0.1,
+        # Shared async client with tuned keep-alive so parallel tool-call
+        # turns reuse warm connections to the OpenAI API.
+        http_async_client=httpx.AsyncClient(limits=_POOL_LIMITS),
     )
 
 
-# ── Single-question helper ─────────────────────────────────────────────────
-async def ask(question: str) -> str:
-    client = _make_client()
-    tools = await client.get_tools()
-    agent = create_react_agent(model=_make_llm(), tools=tools, prompt=SYSTEM_PROMPT)
+# ── Agent construction ─────────────────────────────────────────────────────
+
+# Tool list fetched from the MCP server once per process; every further
+# agent build (tests, reloads, multiple agents) reuses it without the
+# HTTP round trip.
+_tools_cache: list | None = None
+
+
+async def _get_tools() -> list:
+    global _tools_cache
+    if _tools_cache is None:
+        client = _make_client()
+        _tools_cache = await client.get_tools()
+    return _tools_cache
+
+
+async def init_agent():
+    """Build the ReAct agent once: fetch MCP tools, create the LLM, compile."""
+    tools = await _get_tools()
+    return create_react_agent(model=_make_llm(), tools=tools, prompt=SYSTEM_PROMPT)
+
+
+# Process-wide agent singleton so repeated ask() calls (tests, notebooks)
+# skip the MCP tool fetch and graph compilation after the first one.
+_agent_singleton = None
+_agent_lock = asyncio.Lock()
+
+
+async def _get_agent():
+    global _agent_singleton
+    if _agent_singleton is None:
+        async with _agent_lock:
+            if _agent_singleton is None:
+                _agent_singleton = await init_agent()
+    return _agent_singleton
+
+
+async def ask_with(agent, question: str) -> str:
+    """Run a single question through an already-built agent."""
     result = await agent.ainvoke(
         {"messages": [HumanMessage(content=question)]},
         config={"recursion_limit": 25},
@@ -89,13 +146,17 @@ async def ask(question: str) -> str:
     return result["messages"][-1].content
 
 
+# ── Single-question helper ─────────────────────────────────────────────────
+async def ask(question: str) -> str:
+    agent = await _get_agent()
+    return await ask_with(agent, question)
+
+
 # ── Interactive REPL ───────────────────────────────────────────────────────
 async def interactive_loop() -> None:
     print("HR Agent ready. Type 'exit' or 'quit' to stop.\n")
 
-    client = _make_client()
-    tools = await client.get_tools()
-    agent = create_react_agent(model=_make_llm(), tools=tools, prompt=SYSTEM_PROMPT)
+    agent = await _get_agent()
 
     while True:
         try:
@@ -106,15 +167,11 @@ async def interactive_loop() -> None:
 
         if not question:
             continue
-        if question.lower() in {"exit", "quit", "bye"}:
+        if question.lower() in _EXIT_WORDS:
             print("Goodbye.")
             break
 
-        result = await agent.ainvoke(
-            {"messages": [HumanMessage(content=question)]},
-            config={"recursion_limit": 25},
-        )
-        answer = result["messages"][-1].content
+        answer = await ask_with(agent, question)
         print(f"\nHR Agent: {answer}\n")
 
 
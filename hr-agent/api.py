@@ -1,13 +1,26 @@
 """
 FastAPI wrapper around the HR LangGraph agent.
 Exposes POST /ask for question answering and GET /health for liveness.
+
+The MCP client, tool list, LLM, and ReAct graph are built once at startup
+(see lifespan) and reused for every request — rebuilding them per call
+costs an HTTP round trip to the MCP server before any tokens are generated.
 """
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
-from agent import ask
+from agent import init_agent, ask_with
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.agent = await init_agent()
+    yield
+
 
-app = FastAPI(title="HR Agent API", version="1.0.0")
+app = FastAPI(title="HR Agent API", version="1.0.0", lifespan=lifespan)
 
 
 class QuestionRequest(BaseModel):
@@ -27,5 +40,5 @@ def health():
 async def ask_question(req: QuestionRequest):
     if not req.question.strip():
         raise HTTPException(status_code=400, detail="question must not be empty")
-    answer = await ask(req.question)
+    answer = await ask_with(app.state.agent, req.question)
     return AnswerResponse(answer=answer)
@@ -157,6 +157,16 @@ def run_agent(agent, query: str) -> str:
     return response
 
 
+async def run_agent_async(agent, query: str) -> str:
+    """Async variant of run_agent, for callers that overlap invocations."""
+    messages = [HumanMessage(content=query)]
+
+    result = await agent.ainvoke({"messages": messages})
+
+    response = result["messages"][-1].content
+    return response
+
+
 def run_demo():
     """Run the LangSmith demo with various example queries."""
 
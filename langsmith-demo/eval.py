@@ -5,16 +5,19 @@ LangSmith Evaluation & Dataset Demo
 Demonstrates how to:
   1. Create a labeled test dataset in LangSmith
   2. Define custom evaluators (keyword match + LLM-as-judge)
-  3. Run an experiment with langsmith.evaluation.evaluate()
+  3. Run an experiment with langsmith.evaluation.aevaluate()
   4. Print a results summary
 
 Run:
     python eval.py
 """
 
-import json
+import asyncio
 import os
 import re
+from collections import defaultdict
+
+import orjson
 
 from dotenv import load_dotenv
 
@@ -23,10 +26,10 @@ load_dotenv()
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
 from langsmith import Client
-from langsmith.evaluation import evaluate
+from langsmith.evaluation import aevaluate
 
 # Import the existing agent helpers
-from agent import create_agent, run_agent
+from agent import create_agent, run_agent_async
 
 # ─── LangSmith client ────────────────────────────────────────────────────────
 
@@ -34,6 +37,35 @@ client = Client()
 
 DATASET_NAME = "agent-tool-eval-v2"
 
+# Judge LLM built once — instantiating ChatOpenAI per example rebuilds the
+# underlying OpenAI client (and its connection pool) every call.
+_JUDGE_LLM = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+
+# Prompt and chain are also static: building a ChatPromptTemplate per
+# example re-validates templates and reassembles the RunnableSequence.
+_JUDGE_PROMPT = ChatPromptTemplate.from_messages([
+    (
+        "system",
+        "You are an objective evaluator. "
+        "Given a user question, an expected-answer hint, and an agent response, "
+        "output ONLY valid JSON: {{\"score\": <0 or 1>, \"reason\": \"<brief reason>\"}}.\n"
+        "Score 1 if the response is factually correct and addresses the question; "
+        "0 otherwise.",
+    ),
+    (
+        "human",
+        "Question: {question}\n"
+        "Expected hint: {expected}\n"
+        "Agent response: {response}",
+    ),
+])
+
+_JUDGE_CHAIN = _JUDGE_PROMPT | _JUDGE_LLM
+
+# Compiled once; the non-greedy bracket-free body also avoids the
+# backtracking that r"\{.*\}" can hit on long LLM outputs.
+_JSON_RE = re.compile(r"\{[^{}]*\}", re.DOTALL)
+
 # ─── 1. Test Dataset ─────────────────────────────────────────────────────────
 #
 # Each test case has:
@@ -82,9 +114,9 @@ TEST_CASES = [
 
 def create_or_get_dataset() -> str:
     """Upload the test dataset to LangSmith (skip if it already exists)."""
-    existing = [ds for ds in client.list_datasets() if ds.name == DATASET_NAME]
-    if existing:
-        count = len(list(client.list_examples(dataset_name=DATASET_NAME)))
+    if client.has_dataset(dataset_name=DATASET_NAME):
+        # Count via the generator — no need to hold every example in memory.
+        count = sum(1 for _ in client.list_examples(dataset_name=DATASET_NAME))
         print(f"✅ Using existing dataset '{DATASET_NAME}' ({count} examples)")
         return DATASET_NAME
 
@@ -110,18 +142,22 @@ def create_or_get_dataset() -> str:
 
 # ─── 3. Target function ───────────────────────────────────────────────────────
 #
-# evaluate() calls this once per dataset example.
-# Build the agent lazily so we reuse it across calls.
+# aevaluate() calls this once per dataset example.
+# Build the agent lazily so we reuse it across calls; the lock keeps
+# concurrent first calls from building it twice.
 
 _agent = None
+_agent_lock = asyncio.Lock()
 
 
-def agent_target(inputs: dict) -> dict:
+async def agent_target(inputs: dict) -> dict:
     """Invoke the agent and return its response."""
     global _agent
     if _agent is None:
-        _agent = create_agent()
-    response = run_agent(_agent, inputs["input"])
+        async with _agent_lock:
+            if _agent is None:
+                _agent = create_agent()
+    response = await run_agent_async(_agent, inputs["input"])
     return {"output": response}
 
 
@@ -133,14 +169,24 @@ def agent_target(inputs: dict) -> dict:
 #   comment – optional human-readable explanation
 
 
+# Compiled case-insensitive patterns per expected keyword, so the (long)
+# agent output never needs a full lowercased copy and search stops at the
+# first match.
+_KW_CACHE: dict[str, re.Pattern] = {}
+
+
 def contains_keyword(run, example) -> dict:
     """
     Keyword evaluator: passes when the expected phrase appears
     (case-insensitive) anywhere in the agent's response.
     """
-    expected = (example.outputs or {}).get("expected", "").lower()
-    actual   = (run.outputs   or {}).get("output",   "").lower()
-    passed   = bool(expected) and (expected in actual)
+    expected = (example.outputs or {}).get("expected", "")
+    actual   = (run.outputs   or {}).get("output",   "")
+    if expected:
+        pattern = _KW_CACHE.setdefault(expected, re.compile(re.escape(expected), re.IGNORECASE))
+        passed = pattern.search(actual) is not None
+    else:
+        passed = False
     return {
         "key":     "contains_keyword",
         "score":   int(passed),
@@ -148,42 +194,23 @@ def contains_keyword(run, example) -> dict:
     }
 
 
-def llm_correctness(run, example) -> dict:
+async def llm_correctness(run, example) -> dict:
     """
     LLM-as-judge evaluator.
 
     Asks gpt-4o-mini to rate whether the agent's response correctly
-    answers the question (score 1) or not (score 0).
+    answers the question (score 1) or not (score 0). Async so multiple
+    judge calls overlap instead of serializing on blocking HTTP.
     """
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-
-    prompt = ChatPromptTemplate.from_messages([
-        (
-            "system",
-            "You are an objective evaluator. "
-            "Given a user question, an expected-answer hint, and an agent response, "
-            "output ONLY valid JSON: {{\"score\": <0 or 1>, \"reason\": \"<brief reason>\"}}.\n"
-            "Score 1 if the response is factually correct and addresses the question; "
-            "0 otherwise.",
-        ),
-        (
-            "human",
-            "Question: {question}\n"
-            "Expected hint: {expected}\n"
-            "Agent response: {response}",
-        ),
-    ])
-
-    chain = prompt | llm
-    result = chain.invoke({
+    result = await _JUDGE_CHAIN.ainvoke({
         "question": (example.inputs  or {}).get("input",    ""),
         "expected":  (example.outputs or {}).get("expected", ""),
         "response":  (run.outputs     or {}).get("output",   ""),
     })
 
     try:
-        match  = re.search(r"\{.*\}", result.content, re.DOTALL)
-        parsed = json.loads(match.group()) if match else {}
+        match  = _JSON_RE.search(result.content)
+        parsed = orjson.loads(match.group()) if match else {}
         score  = int(bool(parsed.get("score", 0)))
         reason = parsed.get("reason", "")
     except Exception:
@@ -194,7 +221,7 @@ def llm_correctness(run, example) -> dict:
 
 # ─── 5. Run experiment ────────────────────────────────────────────────────────
 
-def run_experiment(prefix: str = "agent-eval") -> None:
+async def run_experiment(prefix: str = "agent-eval") -> None:
     """
     Upload the dataset (if needed) and run the evaluation experiment
     against the agent, then print a summary table.
@@ -207,7 +234,7 @@ def run_experiment(prefix: str = "agent-eval") -> None:
     print(f"\n🔄 Evaluating agent against '{dataset_name}'…")
     print("   (Each example invokes the live agent — this may take a minute)\n")
 
-    results = evaluate(
+    results = await aevaluate(
         agent_target,
         data=dataset_name,
         evaluators=[contains_keyword, llm_correctness],
@@ -217,24 +244,27 @@ def run_experiment(prefix: str = "agent-eval") -> None:
             "tools":       ["calculator", "get_weather", "search_web"],
             "description": "Baseline evaluation of the demo agent",
         },
-        max_concurrency=2,   # run 2 examples in parallel to stay rate-limit safe
+        max_concurrency=10,  # judge calls are async now, so overlap more examples
     )
 
     # ─── 6. Summary ──────────────────────────────────────────────────────────
     print("\n📊 Results Summary")
     print("=" * 50)
 
-    score_buckets: dict[str, list[float]] = {}
-    for result in results:
+    # One pass, constant memory per metric: [score sum, passed count, total].
+    score_buckets: dict[str, list[float]] = defaultdict(lambda: [0.0, 0, 0])
+    async for result in results:
         eval_results = (result.get("evaluation_results") or {}).get("results") or []
         for er in eval_results:
-            score_buckets.setdefault(er.key, []).append(er.score or 0)
+            score = er.score or 0
+            bucket = score_buckets[er.key]
+            bucket[0] += score
+            bucket[1] += score > 0
+            bucket[2] += 1
 
     if score_buckets:
-        for metric, values in score_buckets.items():
-            avg    = sum(values) / len(values)
-            passed = sum(v > 0 for v in values)
-            print(f"  {metric:25s}: {avg:.0%}  ({passed}/{len(values)} passed)")
+        for metric, (total, passed, count) in score_buckets.items():
+            print(f"  {metric:25s}: {total / count:.0%}  ({passed}/{count} passed)")
     else:
         print("  No scores collected — check LangSmith UI for details.")
 
@@ -253,4 +283,4 @@ if __name__ == "__main__":
         print("❌ OPENAI_API_KEY is not set. Add it to your .env file.")
         raise SystemExit(1)
 
-    run_experiment()
+    asyncio.run(run_experiment())
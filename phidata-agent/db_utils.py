@@ -0,0 +1,37 @@
+import sqlite3
+
+# Applied to every connection: WAL for concurrent readers, NORMAL sync
+# (safe under WAL, far fewer fsyncs than FULL), 128 MB page cache, 1 GB
+# mmap so reads hit the OS page cache directly, and in-memory temp tables.
+_TUNING_PRAGMAS = (
+    "synchronous=NORMAL",
+    "cache_size=-131072",
+    "mmap_size=1073741824",
+    "temp_store=MEMORY",
+)
+
+
+def open_db(path: str, readonly: bool = False) -> sqlite3.Connection:
+    """
+    Open a SQLite connection with the shared tuning pragmas applied.
+
+    isolation_level=None leaves transaction control to the caller, so bulk
+    loads can wrap everything in one explicit BEGIN/COMMIT.
+
+    Args:
+        path: Path to the database file
+        readonly: Open in read-only mode and enforce PRAGMA query_only
+
+    Returns:
+        A tuned sqlite3.Connection (check_same_thread=False)
+    """
+    uri = f"file:{path}?mode=ro" if readonly else path
+    conn = sqlite3.connect(uri, uri=readonly, check_same_thread=False, isolation_level=None)
+    if not readonly:
+        # Switching journal modes writes to the DB, so skip it on ro handles.
+        conn.execute("PRAGMA journal_mode=WAL")
+    for pragma in _TUNING_PRAGMAS:
+        conn.execute("PRAGMA " + pragma)
+    if readonly:
+        conn.execute("PRAGMA query_only=ON")
+    return conn
@@ -1,13 +1,76 @@
 from phi.tools import Toolkit
+import os
 import sqlite3
 import pandas as pd
+from functools import lru_cache
+
+from db_utils import open_db
+
+
+@lru_cache(maxsize=64)
+def _schema_impl(db_path: str, table_name: str, mtime: float) -> str:
+    """Cached schema lookup; mtime in the key invalidates on DB rewrite."""
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.cursor()
+
+        # Get column info
+        cursor.execute(f"PRAGMA table_info({table_name})")
+        columns = cursor.fetchall()
+
+        # Get sample values for each column
+        cursor.execute(f"SELECT * FROM {table_name} LIMIT 1")
+        sample = cursor.fetchone()
+    finally:
+        conn.close()
+
+    result = f"Schema for table '{table_name}':\n\n"
+    result += "| Column | Type | Sample Value |\n"
+    result += "|--------|------|-------------|\n"
+
+    for i, col in enumerate(columns):
+        col_name = col[1]
+        col_type = col[2]
+        sample_val = sample[i] if sample else "N/A"
+        result += f"| {col_name} | {col_type} | {sample_val} |\n"
+
+    return result
+
+
+def _markdown_table(columns, rows) -> str:
+    """Render rows as a markdown table without the pandas/tabulate detour.
+
+    For the <100-row results agent queries typically return, building the
+    DataFrame just to call to_markdown costs more than the formatting itself.
+    """
+    header = "| " + " | ".join(columns) + " |\n|" + "---|" * len(columns) + "\n"
+    body = "\n".join("| " + " | ".join(map(str, row)) + " |" for row in rows)
+    return header + body
+
 
 class CustomSQLTools(Toolkit):
   
     def __init__(self, db_path: str):
         super().__init__(name="custom_sql_tools")
         self.db_path = db_path
-        
+
+        # One connection for the toolkit's lifetime: reopening per tool call
+        # re-parses pragmas and reallocates the page cache on every small
+        # agent read. All tools here are read-only, so open in ro mode with
+        # query_only enforced by the shared helper.
+        self._conn = open_db(self.db_path, readonly=True)
+
+        # Identifier whitelists built once: table/column names are rejected
+        # before they reach an f-string, and the SQL text for validated
+        # identifiers stays stable so SQLite's statement cache gets hits.
+        self._tables: set = set()
+        self._columns: dict = {}
+        for (table,) in self._conn.execute("SELECT name FROM sqlite_master WHERE type='table'"):
+            self._tables.add(table)
+            self._columns[table] = {
+                row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")
+            }
+
         # Register functions as tools
         self.register(self.execute_query)
         self.register(self.get_schema)
@@ -26,16 +89,16 @@ class CustomSQLTools(Toolkit):
             Query results as a formatted string
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            df = pd.read_sql_query(query, conn)
-            conn.close()
-            
-            if df.empty:
+            cursor = self._conn.execute(query)
+            columns = [d[0] for d in cursor.description] if cursor.description else []
+            rows = cursor.fetchall()
+
+            if not rows:
                 return "Query returned no results."
-            
+
             # Format output nicely
-            result = f"Query Results ({len(df)} rows):\n\n"
-            result += df.to_markdown(index=False)
+            result = f"Query Results ({len(rows)} rows):\n\n"
+            result += _markdown_table(columns, rows)
             return result
             
         except Exception as e:
@@ -52,31 +115,13 @@ class CustomSQLTools(Toolkit):
             Table schema information
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Get column info
-            cursor.execute(f"PRAGMA table_info({table_name})")
-            columns = cursor.fetchall()
-            
-            # Get sample values for each column
-            cursor.execute(f"SELECT * FROM {table_name} LIMIT 1")
-            sample = cursor.fetchone()
-            
-            conn.close()
-            
-            result = f"Schema for table '{table_name}':\n\n"
-            result += "| Column | Type | Sample Value |\n"
-            result += "|--------|------|-------------|\n"
-            
-            for i, col in enumerate(columns):
-                col_name = col[1]
-                col_type = col[2]
-                sample_val = sample[i] if sample else "N/A"
-                result += f"| {col_name} | {col_type} | {sample_val} |\n"
-            
-            return result
-            
+            if table_name not in self._tables:
+                return f"Error getting schema: unknown table '{table_name}'"
+
+            # The schema only changes when the DB file is rewritten, so the
+            # memoized lookup keyed on mtime turns repeat calls into dict hits.
+            return _schema_impl(self.db_path, table_name, os.path.getmtime(self.db_path))
+
         except Exception as e:
             return f"Error getting schema: {str(e)}"
     
@@ -92,11 +137,16 @@ class CustomSQLTools(Toolkit):
             Sample data as formatted string
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            df = pd.read_sql_query(f"SELECT * FROM {table_name} LIMIT {limit}", conn)
-            conn.close()
-            
-            return f"Sample data from '{table_name}':\n\n{df.to_markdown(index=False)}"
+            if table_name not in self._tables:
+                return f"Error getting sample data: unknown table '{table_name}'"
+
+            # limit is bound as a parameter, so the SQL text per table stays
+            # stable and a handful of rows never touches pandas.
+            cursor = self._conn.execute(f"SELECT * FROM {table_name} LIMIT ?", (limit,))
+            columns = [d[0] for d in cursor.description]
+            rows = cursor.fetchall()
+
+            return f"Sample data from '{table_name}':\n\n{_markdown_table(columns, rows)}"
             
         except Exception as e:
             return f"Error getting sample data: {str(e)}"
@@ -113,28 +163,32 @@ class CustomSQLTools(Toolkit):
             Column statistics
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            
+            if table_name not in self._tables:
+                return f"Error getting column stats: unknown table '{table_name}'"
+            if column not in self._columns[table_name]:
+                return f"Error getting column stats: unknown column '{column}' in table '{table_name}'"
+
+            # SQLite computes all five aggregates in one table pass; a 1x5
+            # result doesn't need a DataFrame, just fetchone and unpack.
             query = f"""
-            SELECT 
-                COUNT({column}) as count,
-                MIN({column}) as min_value,
-                MAX({column}) as max_value,
-                AVG({column}) as avg_value,
-                SUM({column}) as total
+            SELECT
+                COUNT({column}),
+                MIN({column}),
+                MAX({column}),
+                AVG({column}),
+                SUM({column})
             FROM {table_name}
             """
-            
-            df = pd.read_sql_query(query, conn)
-            conn.close()
-            
+
+            count, min_value, max_value, avg_value, total = self._conn.execute(query).fetchone()
+
             result = f"Statistics for '{column}' in '{table_name}':\n\n"
-            result += f"- Count: {df['count'].iloc[0]:,}\n"
-            result += f"- Min: {df['min_value'].iloc[0]:,.2f}\n"
-            result += f"- Max: {df['max_value'].iloc[0]:,.2f}\n"
-            result += f"- Average: {df['avg_value'].iloc[0]:,.2f}\n"
-            result += f"- Total: {df['total'].iloc[0]:,.2f}\n"
-            
+            result += f"- Count: {count:,}\n"
+            result += f"- Min: {min_value:,.2f}\n"
+            result += f"- Max: {max_value:,.2f}\n"
+            result += f"- Average: {avg_value:,.2f}\n"
+            result += f"- Total: {total:,.2f}\n"
+
             return result
             
         except Exception as e:
@@ -158,17 +212,19 @@ class CustomSQLTools(Toolkit):
             Matching records
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            
-            query = f"""
-            SELECT * FROM {table_name}
-            WHERE {column} LIKE '%{search_term}%'
-            LIMIT 20
-            """
-            
-            df = pd.read_sql_query(query, conn)
-            conn.close()
-            
+            # Validate identifiers against the whitelists, then bind the term
+            # with a ? placeholder. Besides closing the injection hole, the
+            # SQL text stays identical across searches so SQLite reuses the
+            # prepared statement instead of re-planning.
+            if table_name not in self._tables:
+                return f"Error searching data: unknown table '{table_name}'"
+            if column not in self._columns[table_name]:
+                return f"Error searching data: unknown column '{column}' in table '{table_name}'"
+
+            query = f"SELECT * FROM {table_name} WHERE {column} LIKE ? LIMIT 20"
+
+            df = pd.read_sql_query(query, self._conn, params=(f"%{search_term}%",))
+
             if df.empty:
                 return f"No records found matching '{search_term}' in column '{column}'"
             
@@ -1,15 +1,17 @@
-import json
 from typing import Any
 
+import orjson
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
 from chroma_client import DEFAULT_COLLECTION
 from rag import get_graph
 
-app = FastAPI(title="LangGraph RAG + Chroma Cloud")
+# ORJSONResponse serializes with the C-extension orjson and, without a
+# response_model, skips pydantic re-validation of data we built ourselves.
+app = FastAPI(title="LangGraph RAG + Chroma Cloud", default_response_class=ORJSONResponse)
 
 # https://example.com and https://sample.com
 app.add_middleware(
@@ -24,34 +26,69 @@ class ChatRequest(BaseModel):
     message: str = Field(..., min_length=1)
     collection: str | None = None
 
-class ChatResponse(BaseModel):
-    answer: str
-    sources: list[dict[str, Any]]
+_SOURCE_KEYS = ("source", "chunk", "id")
+_EMPTY_SOURCE = {key: None for key in _SOURCE_KEYS}
+
 
 def _format_sources(docs: list[Any]) -> list[dict[str, Any]]:
-    sources: list[dict[str, Any]] = []
+    out: list[dict[str, Any]] = []
     for doc in docs:
-        meta = doc.metadata or {}
-        sources.append(
-            {
-                "source": meta.get("source"),
-                "chunk": meta.get("chunk"),
-                "id": meta.get("id"),
-            }
-        )
-    return sources
+        meta = doc.metadata
+        if not meta:
+            out.append(dict(_EMPTY_SOURCE))
+            continue
+        out.append({key: meta.get(key) for key in _SOURCE_KEYS})
+    return out
+
+@app.on_event("startup")
+async def _warm_default_graph():
+    # Build the default collection's graph now so the first /chat doesn't
+    # pay retriever + graph compilation latency.
+    get_graph(DEFAULT_COLLECTION)
+
 
 @app.get("/")
 async def root():
     return {"status": "ok", "service": "langgraph-rag"}
 
 
-@app.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
+async def _sse(graph: Any, question: str):
+    # "custom" relays the {"type": "token", ...} payloads the generate node
+    # emits through get_stream_writer as they arrive; "values" snapshots the
+    # graph state so the final event can carry the same answer/sources the
+    # buffered /chat/sync response returns.
+    final_state: dict[str, Any] = {}
+    async for mode, chunk in graph.astream(
+        {"question": question}, stream_mode=["custom", "values"]
+    ):
+        if mode == "custom":
+            yield b"data: " + orjson.dumps(chunk) + b"\n\n"
+        else:
+            final_state = chunk
+    result = {
+        "type": "result",
+        "answer": final_state.get("answer", ""),
+        "sources": _format_sources(final_state.get("docs", [])),
+    }
+    yield b"data: " + orjson.dumps(result) + b"\n\n"
+    yield b"data: " + orjson.dumps({"type": "done"}) + b"\n\n"
+
+
+@app.post("/chat")
+async def chat(request: ChatRequest) -> StreamingResponse:
+    collection = request.collection or DEFAULT_COLLECTION
+    graph = get_graph(collection)
+    return StreamingResponse(
+        _sse(graph, request.message), media_type="text/event-stream"
+    )
+
+
+@app.post("/chat/sync")
+async def chat_sync(request: ChatRequest):
     collection = request.collection or DEFAULT_COLLECTION
     graph = get_graph(collection)
     result = await graph.ainvoke({"question": request.message})
-    return ChatResponse(
-        answer=result.get("answer", ""),
-        sources=_format_sources(result.get("docs", [])),
-    )
\ No newline at end of file
+    return {
+        "answer": result.get("answer", ""),
+        "sources": _format_sources(result.get("docs", [])),
+    }
\ No newline at end of file
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
-from functools import lru_cache
-from typing import List, TypedDict
+import asyncio
+from typing import Any, Dict, List, TypedDict
 
 from langchain_core.documents import Document
 from langchain_core.messages import HumanMessage, SystemMessage
@@ -16,6 +16,9 @@ SYSTEM_PROMPT = (
     "ingest to answer better."
 )
 
+# Identical on every request, so build the message object once.
+_SYSTEM_MSG = SystemMessage(SYSTEM_PROMPT)
+
 
 class RAGState(TypedDict):
     question: str
@@ -25,35 +28,49 @@ class RAGState(TypedDict):
 
 
 def _format_context(docs: List[Document]) -> str:
-    if not docs:
-        return ""
-    chunks = []
-    for idx, doc in enumerate(docs, start=1):
-        source = (doc.metadata or {}).get("source", "unknown")
-        chunks.append(f"[{idx}] Source: {source}\n{doc.page_content}")
-    return "\n\n".join(chunks)
+    return "\n\n".join(
+        f"[{idx}] Source: {(doc.metadata or {}).get('source', 'unknown')}\n{doc.page_content}"
+        for idx, doc in enumerate(docs, start=1)
+    )
+
+
+# Compiled graphs per collection. A plain dict instead of lru_cache so a
+# collection can be evicted when it is re-ingested (see invalidate_graph).
+_GRAPHS: Dict[str, Any] = {}
 
 
-@lru_cache(maxsize=8)
 def get_graph(collection_name: str = DEFAULT_COLLECTION):
+    graph = _GRAPHS.get(collection_name)
+    if graph is None:
+        graph = _GRAPHS[collection_name] = _build_graph(collection_name)
+    return graph
+
+
+def invalidate_graph(collection_name: str) -> None:
+    """Drop the cached graph for a collection, e.g. after re-ingestion."""
+    _GRAPHS.pop(collection_name, None)
+
+
+def _build_graph(collection_name: str):
     retriever = get_vectorstore(collection_name).as_retriever(
         search_kwargs={"k": DEFAULT_TOP_K}
     )
     llm = get_llm()
 
-    def retrieve(state: RAGState):
-        docs = retriever.invoke(state["question"])
+    async def retrieve(state: RAGState):
+        # Chroma retrieval is synchronous; running it on a worker thread
+        # keeps the event loop free to serve concurrent /chat requests.
+        docs = await asyncio.to_thread(retriever.invoke, state["question"])
         return {"docs": docs}
 
     async def generate(state: RAGState):
         writer = get_stream_writer()
         context = _format_context(state.get("docs", []))
         question = state["question"]
-        user_prompt = (
-            f"Question: {question}\n\n"
-            f"Context:\n{context if context else '[no context retrieved]'}"
+        user_prompt = "\n".join(
+            ("Question: " + question, "", "Context:", context or "[no context retrieved]")
         )
-        messages = [SystemMessage(SYSTEM_PROMPT), HumanMessage(user_prompt)]
+        messages = [_SYSTEM_MSG, HumanMessage(user_prompt)]
 
         parts: List[str] = []
         async for chunk in llm.astream(messages):